@@ -2,4 +2,14 @@ import os
 
 SECRET_KEY = os.environ.get("SECRET_KEY")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# 동시 처리 요청 수 제한 (AIMD)
+CONCURRENCY_INITIAL_LIMIT = int(os.environ.get("CONCURRENCY_INITIAL_LIMIT", 20))
+CONCURRENCY_MIN_LIMIT = int(os.environ.get("CONCURRENCY_MIN_LIMIT", 4))
+CONCURRENCY_MAX_LIMIT = int(os.environ.get("CONCURRENCY_MAX_LIMIT", 200))
+CONCURRENCY_LATENCY_TARGET_MS = int(os.environ.get("CONCURRENCY_LATENCY_TARGET_MS", 500))
+
+# 대기자 자동 배정
+WAITLIST_PROMOTION_INTERVAL_SECONDS = int(os.environ.get("WAITLIST_PROMOTION_INTERVAL_SECONDS", 10))
+WAITLIST_BATCH_DELAY_MS = int(os.environ.get("WAITLIST_BATCH_DELAY_MS", 200))
@@ -6,6 +6,8 @@ from sqlalchemy.orm import sessionmaker
 
 print(os.environ.get( "DATABASE_URL"))
 SQLALCHEMY_DATABASE_URL = os.environ.get( "DATABASE_URL" , "postgresql://web:postgres_pw@db:5432/exam")
+# 시험/예약 데이터를 나눠 담을 샤드 DB 목록 (콤마 구분, 미설정 시 기본 DB 하나만 사용)
+SHARD_DATABASE_URLS = [url.strip() for url in os.environ.get("SHARD_DATABASE_URLS", SQLALCHEMY_DATABASE_URL).split(",") if url.strip()]
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, echo=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,141 @@
+import re
+import time
+from starlette.responses import JSONResponse
+from .config import CONCURRENCY_INITIAL_LIMIT, CONCURRENCY_MIN_LIMIT, CONCURRENCY_MAX_LIMIT, CONCURRENCY_LATENCY_TARGET_MS
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRIORITY_CRITICAL = "critical"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+# 우선순위별로 사용할 수 있는 limit 비율 (낮은 우선순위부터 먼저 거절)
+PRIORITY_SHARE = {
+    PRIORITY_CRITICAL: 1.0,
+    PRIORITY_NORMAL: 0.8,
+    PRIORITY_LOW: 0.5,
+}
+
+# (method, path) 별 우선순위, 매칭되지 않으면 normal
+ROUTE_PRIORITIES = [
+    ({"POST"}, re.compile(r"^/v1/(admin/)?login$"), PRIORITY_CRITICAL),
+    ({"POST", "PUT", "DELETE"}, re.compile(r"^/v1/reservation/\d+$"), PRIORITY_CRITICAL),
+    ({"GET"}, re.compile(r"^/v1/exam$"), PRIORITY_LOW),
+    ({"GET"}, re.compile(r"^/v1/admin/reservation$"), PRIORITY_LOW),
+]
+
+# 경로별 기준 응답 시간(최소 응답 시간)을 유지할 최대 경로 수
+MAX_ROUTE_BASELINES = 1000
+# 기준 응답 시간의 몇 배를 넘으면 과부하로 판단
+LATENCY_TOLERANCE = 2.0
+# 기준보다 느린 응답이 계속될 때 기준 응답 시간이 따라 올라가는 비율
+BASELINE_DRIFT = 0.001
+
+PATH_ID_PATTERN = re.compile(r"/\d+")
+
+def route_key(method: str, path: str) -> str:
+    # /v1/reservation/3 -> /v1/reservation/{id}
+    path = PATH_ID_PATTERN.sub("/{id}", path)
+    return f"{method} {path}"
+
+def route_priority(method: str, path: str) -> str:
+    for methods, pattern, priority in ROUTE_PRIORITIES:
+        if method in methods and pattern.match(path):
+            return priority
+    return PRIORITY_NORMAL
+
+class ConcurrencyLimiter:
+    """응답 시간 기반 AIMD 동시 처리 제한
+
+    경로마다 기준 응답 시간(최소 응답 시간)을 두고, 응답 시간이 기준의 LATENCY_TOLERANCE 배와
+    목표 시간을 모두 넘으면 limit 을 decrease 비율만큼 줄인다 (목표 시간 동안 한번만).
+    원래 느린 경로(관리자 예약 목록 등)는 자신의 기준과 비교하므로 limit 을 낮추지 않는다.
+    그 외에는 limit 가까이 처리 중일 때 limit 을 1/limit 씩 늘린다.
+    """
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int, latency_target: float, decrease: float = 0.9):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.baselines = {}
+        self.admitted = {priority: 0 for priority in PRIORITY_SHARE}
+        self.shed = {priority: 0 for priority in PRIORITY_SHARE}
+
+    def acquire(self, priority: str) -> bool:
+        if self.in_flight >= max(1, int(self.limit * PRIORITY_SHARE[priority])):
+            self.shed[priority] += 1
+            return False
+        self.in_flight += 1
+        self.admitted[priority] += 1
+        return True
+
+    def update_baseline(self, route: str, latency: float):
+        """이번 응답 전의 기준 응답 시간 (처음 보는 경로는 None)"""
+        baseline = self.baselines.get(route)
+        if baseline is None:
+            if len(self.baselines) < MAX_ROUTE_BASELINES:
+                self.baselines[route] = latency
+        elif latency < baseline:
+            self.baselines[route] = latency
+        else:
+            self.baselines[route] = baseline + (latency - baseline) * BASELINE_DRIFT
+        return baseline
+
+    def release(self, route: str, latency: float):
+        self.in_flight -= 1
+        now = time.monotonic()
+        baseline = self.update_baseline(route, latency)
+        if baseline is not None and latency > max(self.latency_target, baseline * LATENCY_TOLERANCE):
+            if now - self.last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self.last_decrease = now
+                logger.info(f"Concurrency limit decreased : {self.limit:.1f} (latency {latency * 1000:.0f}ms)")
+        elif self.in_flight + 1 >= self.limit * PRIORITY_SHARE[PRIORITY_NORMAL]:
+            # 여유가 있을 때만 늘리면 유휴 상태에서 limit 이 무한히 커지지 않음
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "latency_target_ms": int(self.latency_target * 1000),
+            "priority_limits": {priority: max(1, int(self.limit * share)) for priority, share in PRIORITY_SHARE.items()},
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+        }
+
+class LoadShedMiddleware:
+    def __init__(self, app, limiter: ConcurrencyLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = route_priority(scope["method"], scope["path"])
+        route = route_key(scope["method"], scope["path"])
+        if not self.limiter.acquire(priority):
+            response = JSONResponse({"detail": "Server Busy"}, status_code=503, headers={"Retry-After": "1"})
+            await response(scope, receive, send)
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(route, time.monotonic() - start)
+
+limiter = ConcurrencyLimiter(
+    CONCURRENCY_INITIAL_LIMIT,
+    CONCURRENCY_MIN_LIMIT,
+    CONCURRENCY_MAX_LIMIT,
+    CONCURRENCY_LATENCY_TARGET_MS / 1000
+)
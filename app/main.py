@@ -1,6 +1,8 @@
 from fastapi import FastAPI
-from .database import engine
-from . import models
+from .shard import shard_router
+from .limiter import limiter, LoadShedMiddleware
+from .profiler import profiler, ProfilerMiddleware
+from .waitlist import promotion_worker
 from app.router.v1 import member_router, exam_router, reservation_router, admin_router
 import logging
 
@@ -8,8 +10,11 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI()
+app.add_middleware(ProfilerMiddleware, profiler=profiler)
+app.add_middleware(LoadShedMiddleware, limiter=limiter)
 
-models.Base.metadata.create_all(bind=engine)
+shard_router.create_all()
+promotion_worker.start()
 
 # v1 API
 app.include_router(member_router.router, prefix="/v1")
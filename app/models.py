@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -34,9 +34,31 @@ class Exam(Base):
 class ExamReservation(Base):
     __tablename__ = "ExamReservation"
 
-    MemberIdx = Column(Integer, ForeignKey("Member.MemberIdx"), primary_key=True)
+    # Member 는 기본 DB 에만 있으므로 샤드 간 FK 는 걸지 않음
+    MemberIdx = Column(Integer, primary_key=True)
     ExamIdx = Column(Integer, ForeignKey("Exam.ExamIdx"), primary_key=True)
     Memo = Column(String, default="")
     ConfirmDatetime = Column(DateTime, nullable=True)
     RegDatetime = Column(DateTime,  server_default=func.now())
 
+class ExamWaitlist(Base):
+    __tablename__ = "ExamWaitlist"
+    __table_args__ = (UniqueConstraint("ExamIdx", "MemberIdx"),)
+
+    # 대기 순서
+    WaitlistIdx = Column(Integer, primary_key=True, autoincrement=True)
+    ExamIdx = Column(Integer, ForeignKey("Exam.ExamIdx"), nullable=False, index=True)
+    MemberIdx = Column(Integer, nullable=False)
+    Memo = Column(String, default="")
+    Status = Column(String, nullable=False, default="WAITING", index=True)
+    PromotedDatetime = Column(DateTime, nullable=True)
+    # 자동 배정 시 배정 작업 단위로 부여하는 토큰
+    PromotionToken = Column(String, nullable=True, index=True)
+    RegDatetime = Column(DateTime, server_default=func.now())
+
+class ExamShard(Base):
+    __tablename__ = "ExamShard"
+
+    ExamIdx = Column(Integer, primary_key=True, autoincrement=True)
+    ShardIdx = Column(Integer, nullable=False)
+    RegDatetime = Column(DateTime, server_default=func.now())
@@ -0,0 +1,258 @@
+import re
+import sys
+import time
+import threading
+from collections import Counter, deque
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 128
+MAX_SLOW_QUERIES = 200
+# EXPLAIN 가능한 SQL
+EXPLAIN_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+# 요청을 처리하는 스레드 (동기 라우트/의존성은 anyio 스레드풀, 샤드 병렬 조회는 shard-scatter)
+REQUEST_THREAD_PREFIXES = ("AnyIO worker thread", "shard-scatter")
+
+# 스택의 가장 안쪽부터 먼저 매칭되는 모듈로 샘플 분류
+CATEGORY_MODULES = [
+    ("sqlalchemy", ("sqlalchemy", "psycopg2")),
+    ("serialization", ("pydantic", "pydantic_core", "fastapi.encoders", "json", "starlette.responses")),
+    ("handler", ("app.",)),
+]
+
+def _frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+def _categorize(stack: tuple) -> str:
+    for name in reversed(stack):
+        module = name.split(":", 1)[0]
+        if module == "fastapi.routing" and name.endswith(":serialize_response"):
+            return "serialization"
+        for category, prefixes in CATEGORY_MODULES:
+            if module.startswith(prefixes):
+                return category
+    return "other"
+
+class RequestProfiler:
+    """관리자 요청 시 다음 N 개 요청을 샘플링 프로파일링
+
+    프로파일링 대상 요청이 처리 중일 때만 interval 마다 요청 처리 스레드의 스택을 수집하고,
+    요청 처리 구간에 수집된 샘플을 해당 요청에 귀속시킨다.
+    (동시에 처리되는 요청끼리는 샘플이 섞일 수 있음)
+    비활성 상태에서는 middleware 에서 enabled 플래그만 확인한다.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.remaining = 0
+        self.route = None
+        self.latency_threshold = 0.0
+        self.interval = 0.005
+        self.in_flight = {}
+        self.samples = deque()
+        self.results = []
+        self.stacks = Counter()
+        self.sampler = None
+        self.on_finish = None
+        self.stop_event = threading.Event()
+
+    def start(self, count: int, route: Optional[str] = None, latency_threshold_ms: int = 0, interval_ms: int = 5, on_finish: Optional[Callable] = None):
+        self.stop()
+        with self.lock:
+            self.reset()
+            self.remaining = count
+            self.route = re.compile(route) if route else None
+            self.latency_threshold = latency_threshold_ms / 1000
+            self.interval = interval_ms / 1000
+            # Count 개 수집 완료 시 호출 (SQL 수집 중지 등)
+            self.on_finish = on_finish
+            self.sampler = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+            self.enabled = True
+        self.sampler.start()
+        logger.info(f"Profiler started : count={count} route={route} latency_threshold_ms={latency_threshold_ms}")
+
+    def stop(self):
+        self.enabled = False
+        self.stop_event.set()
+        if self.sampler and self.sampler is not threading.current_thread():
+            self.sampler.join()
+
+    def match(self, path: str) -> bool:
+        if path.startswith("/v1/admin/profile"):
+            return False
+        return self.route is None or bool(self.route.search(path))
+
+    def begin(self, method: str, path: str):
+        key = object()
+        with self.lock:
+            # 비동기 라우트는 middleware 와 같은 이벤트 루프 스레드에서 처리
+            self.in_flight[key] = (time.monotonic(), f"{method} {path}", threading.get_ident())
+        return key
+
+    def end(self, key):
+        end = time.monotonic()
+        with self.lock:
+            # 재시작 등으로 이미 정리된 요청
+            if key not in self.in_flight:
+                return
+            start, route, _ = self.in_flight.pop(key)
+            samples = [(stack, category) for ts, stack, category in self.samples if start <= ts <= end]
+            # 처리 중인 요청이 참조하지 않는 오래된 샘플 정리
+            oldest = min((ts for ts, _, _ in self.in_flight.values()), default=end)
+            while self.samples and self.samples[0][0] < oldest:
+                self.samples.popleft()
+
+            latency = end - start
+            if not self.enabled or latency < self.latency_threshold:
+                return
+
+            self.stacks.update(stack for stack, _ in samples)
+            self.results.append({
+                "route": route,
+                "latency_ms": round(latency * 1000, 2),
+                "samples": len(samples),
+                "categories": dict(Counter(category for _, category in samples)),
+            })
+            self.remaining -= 1
+            if self.remaining > 0:
+                return
+            self.enabled = False
+            self.stop_event.set()
+            on_finish, self.on_finish = self.on_finish, None
+        logger.info("Profiler finished")
+        if on_finish:
+            on_finish()
+
+    def _sample_loop(self):
+        sampler_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            if not self.in_flight:
+                continue
+            now = time.monotonic()
+            # 요청 처리 스레드만 샘플링 (대기자 배정 등 백그라운드 스레드 제외)
+            with self.lock:
+                request_threads = {ident for _, _, ident in self.in_flight.values()}
+            request_threads |= {
+                thread.ident for thread in threading.enumerate()
+                if thread.name.startswith(REQUEST_THREAD_PREFIXES)
+            }
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id or thread_id not in request_threads:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack = tuple(reversed(stack))
+                # 요청을 처리 중인 경우만 (대기 중인 이벤트 루프/스레드풀 제외)
+                if not any(name.startswith(("app.", "fastapi.")) for name in stack):
+                    continue
+                with self.lock:
+                    self.samples.append((now, stack, _categorize(stack)))
+
+    def folded(self) -> str:
+        """flamegraph.pl / speedscope 에서 읽을 수 있는 folded stack 형식"""
+        with self.lock:
+            return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common())
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "remaining": max(self.remaining, 0),
+                "route": self.route.pattern if self.route else None,
+                "latency_threshold_ms": int(self.latency_threshold * 1000),
+                "requests": list(self.results),
+            }
+
+class SlowQueryCapture:
+    """지정 시간 이상 걸린 SQL 을 파라미터, EXPLAIN 결과와 함께 수집
+
+    활성화 시에만 Engine 이벤트를 등록하므로 비활성 상태의 오버헤드는 없다.
+    프로파일링과 함께 시작하면 프로파일링이 끝날 때 같이 중지된다.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold = 0.0
+        self.queries = deque(maxlen=MAX_SLOW_QUERIES)
+        self.local = threading.local()
+
+    def start(self, threshold_ms: int):
+        self.stop()
+        self.threshold = threshold_ms / 1000
+        self.queries.clear()
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+        self.enabled = True
+        logger.info(f"Slow query capture started : threshold_ms={threshold_ms}")
+
+    def stop(self):
+        if not self.enabled:
+            return
+        event.remove(Engine, "before_cursor_execute", self._before_execute)
+        event.remove(Engine, "after_cursor_execute", self._after_execute)
+        self.enabled = False
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if duration < self.threshold or getattr(self.local, "explaining", False):
+            return
+
+        self.queries.append({
+            "statement": statement,
+            "parameters": repr(parameters),
+            "duration_ms": round(duration * 1000, 2),
+            "plan": None if executemany else self._explain(conn, statement, parameters),
+        })
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[str]:
+        if not statement.lstrip().upper().startswith(EXPLAIN_STATEMENTS):
+            return None
+
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        self.local.explaining = True
+        try:
+            # 요청의 트랜잭션 안에서 실행되므로 실패해도 트랜잭션이 중단되지 않도록 savepoint 사용
+            with conn.begin_nested():
+                rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+            return "\n".join(" ".join(str(column) for column in row) for row in rows)
+        except Exception as e:
+            logger.error(f"Error explain query : {e}")
+            return None
+        finally:
+            self.local.explaining = False
+
+class ProfilerMiddleware:
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if not self.profiler.enabled or scope["type"] != "http" or not self.profiler.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        key = self.profiler.begin(scope["method"], scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(key)
+
+profiler = RequestProfiler()
+slow_query = SlowQueryCapture()
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 from typing import List
+import re
 from ...database import SessionLocal, get_db
 from ... import models, schema, auth
+from ...shard import shard_router, get_exam_db
+from ...waitlist import promotion_worker, clear_promoted
+from ...limiter import limiter
+from ...profiler import profiler, slow_query
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -17,20 +23,23 @@ async def get_reservation(admin_idx: str = Depends(auth.verify_admin_token),db:
         if not db_admin :
             raise HTTPException(status_code=400, detail="Not Admin Auth")
         
-        db_result = (
-            db.query(
-                models.Exam.ExamIdx,
-                models.Exam.Title,
-                models.Exam.ExamDatetime,
-                models.Exam.PersonnelCount,
-                models.ExamReservation.MemberIdx,
-                models.ExamReservation.Memo,
-                models.ExamReservation.ConfirmDatetime,
-                models.ExamReservation.RegDatetime
-            )
-            .outerjoin(models.ExamReservation, 
-                models.Exam.ExamIdx == models.ExamReservation.ExamIdx)
-            .all()
+        db_result = shard_router.gather(
+            lambda session: (
+                session.query(
+                    models.Exam.ExamIdx,
+                    models.Exam.Title,
+                    models.Exam.ExamDatetime,
+                    models.Exam.PersonnelCount,
+                    models.ExamReservation.MemberIdx,
+                    models.ExamReservation.Memo,
+                    models.ExamReservation.ConfirmDatetime,
+                    models.ExamReservation.RegDatetime
+                )
+                .outerjoin(models.ExamReservation, 
+                    models.Exam.ExamIdx == models.ExamReservation.ExamIdx)
+            ),
+            db,
+            key=(models.Exam.ExamIdx, models.ExamReservation.MemberIdx)
         )
 
         response = []
@@ -59,19 +68,19 @@ async def get_reservation(admin_idx: str = Depends(auth.verify_admin_token),db:
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 @router.delete("/admin/reservation/{examIdx}/{memberIdx}")
-async def delete_reservation(examIdx: int, memberIdx: int, admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db)):
+async def delete_reservation(examIdx: int, memberIdx: int, admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db), exam_db: SessionLocal = Depends(get_exam_db)):
     try:
         # admin vertify
         db_admin = db.query(models.Admin).filter(models.Admin.AdminIdx == admin_idx).first()
         if not db_admin :
             raise HTTPException(status_code=400, detail="Not Admin Auth")
 
-        db_exam = db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
+        db_exam = exam_db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
         if not db_exam:
             raise HTTPException(status_code=400, detail="Not Exists Exam Data")
         
         db_reservation = (
-            db.query(models.ExamReservation)
+            exam_db.query(models.ExamReservation)
             .filter(models.ExamReservation.ExamIdx == db_exam.ExamIdx)
             .filter(models.ExamReservation.MemberIdx == memberIdx)
             .first()
@@ -79,8 +88,10 @@ async def delete_reservation(examIdx: int, memberIdx: int, admin_idx: str = Depe
         if not db_reservation:
             raise HTTPException(status_code=400, detail="Not Exists Registred Exam")
         
-        db.delete(db_reservation)
-        db.commit()
+        exam_db.delete(db_reservation)
+        clear_promoted(exam_db, db_exam.ExamIdx, memberIdx)
+        exam_db.commit()
+        promotion_worker.notify(db_exam.ExamIdx)
 
         response = schema.responseModel(result=True, code=00, message="success")
         return response
@@ -93,19 +104,19 @@ async def delete_reservation(examIdx: int, memberIdx: int, admin_idx: str = Depe
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 @router.put("/admin/reservation/{examIdx}/{memberIdx}")
-async def modify_reservation(examIdx: int, memberIdx: int, params: schema.AdminReservation, admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db)):
+async def modify_reservation(examIdx: int, memberIdx: int, params: schema.AdminReservation, admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db), exam_db: SessionLocal = Depends(get_exam_db)):
     try:
         # admin vertify
         db_admin = db.query(models.Admin).filter(models.Admin.AdminIdx == admin_idx).first()
         if not db_admin :
             raise HTTPException(status_code=400, detail="Not Admin Auth")
         
-        db_exam = db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
+        db_exam = exam_db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
         if not db_exam:
             raise HTTPException(status_code=400, detail="Not Exists Exam Data")
         
         db_reservation = (
-            db.query(models.ExamReservation)
+            exam_db.query(models.ExamReservation)
             .filter(models.ExamReservation.MemberIdx == memberIdx)
             .filter(models.ExamReservation.ExamIdx == db_exam.ExamIdx)
             .first()
@@ -117,7 +128,7 @@ async def modify_reservation(examIdx: int, memberIdx: int, params: schema.AdminR
             db_reservation.Memo = params.Memo
         if params.ConfirmDatetime:
             db_reservation.ConfirmDatetime = params.ConfirmDatetime
-        db.commit()
+        exam_db.commit()
 
         response = schema.responseModel(result=True, code=00, message="success")
         return response
@@ -186,16 +197,16 @@ def create_exam(exam: schema.ExamCreate, admin_idx: str = Depends(auth.verify_ad
         if not db_admin :
             raise HTTPException(status_code=400, detail="Not Admin Auth")
         
-        db_exam = db.query(models.Exam).filter(models.Exam.Title == exam.Title).filter(models.Exam.ExamDatetime == exam.ExamDatetime).first()
-        if db_exam:
+        db_exam = shard_router.scatter(
+            lambda session: session.query(models.Exam).filter(models.Exam.Title == exam.Title).filter(models.Exam.ExamDatetime == exam.ExamDatetime).first(),
+            db
+        )
+        if any(db_exam):
             raise HTTPException(status_code=400, detail="already registred Exam Data")
 
         db_exam = models.Exam(ExamDatetime=exam.ExamDatetime, Title=exam.Title, PersonnelCount=exam.PersonnelCount)
         
-        db.add(db_exam)
-        db.commit()
-        db.refresh(db_exam)
-        return db_exam
+        return shard_router.add_exam(db, db_exam)
     except HTTPException as http_exc:
         # HTTPException 발생 시 로깅 후 재발생
         logger.error(f"HTTPException: {http_exc.detail}")
@@ -203,4 +214,119 @@ def create_exam(exam: schema.ExamCreate, admin_idx: str = Depends(auth.verify_ad
     except Exception as e:
         logger.error(f"Error creating exam: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
-    
\ No newline at end of file
+
+@router.get("/admin/limiter")
+def get_limiter_stats(admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db)):
+    try:
+        # admin vertify
+        db_admin = db.query(models.Admin).filter(models.Admin.AdminIdx == admin_idx).first()
+        if not db_admin :
+            raise HTTPException(status_code=400, detail="Not Admin Auth")
+
+        return limiter.stats()
+    except HTTPException as http_exc:
+        # HTTPException 발생 시 로깅 후 재발생
+        logger.error(f"HTTPException: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error get Limiter : {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.post("/admin/profile")
+def start_profile(params: schema.ProfileStart, admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db)):
+    try:
+        # admin vertify
+        db_admin = db.query(models.Admin).filter(models.Admin.AdminIdx == admin_idx).first()
+        if not db_admin :
+            raise HTTPException(status_code=400, detail="Not Admin Auth")
+
+        if params.Count < 1:
+            raise HTTPException(status_code=400, detail="Invalid Profile Count")
+        if params.IntervalMs < 1:
+            raise HTTPException(status_code=400, detail="Invalid Profile Interval")
+        if params.SqlThresholdMs is not None and params.SqlThresholdMs < 1:
+            raise HTTPException(status_code=400, detail="Invalid Profile Sql Threshold")
+        if params.Route:
+            try:
+                re.compile(params.Route)
+            except re.error:
+                raise HTTPException(status_code=400, detail="Invalid Profile Route")
+
+        if params.SqlThresholdMs is not None:
+            slow_query.start(params.SqlThresholdMs)
+        else:
+            slow_query.stop()
+        # Count 개 요청 수집이 끝나면 SQL 수집도 중지
+        profiler.start(params.Count, params.Route, params.LatencyThresholdMs, params.IntervalMs, on_finish=slow_query.stop)
+
+        response = schema.responseModel(result=True, code=00, message="success")
+        return response
+    except HTTPException as http_exc:
+        # HTTPException 발생 시 로깅 후 재발생
+        logger.error(f"HTTPException: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error start Profile : {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.delete("/admin/profile")
+def stop_profile(admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db)):
+    try:
+        # admin vertify
+        db_admin = db.query(models.Admin).filter(models.Admin.AdminIdx == admin_idx).first()
+        if not db_admin :
+            raise HTTPException(status_code=400, detail="Not Admin Auth")
+
+        profiler.stop()
+        slow_query.stop()
+
+        response = schema.responseModel(result=True, code=00, message="success")
+        return response
+    except HTTPException as http_exc:
+        # HTTPException 발생 시 로깅 후 재발생
+        logger.error(f"HTTPException: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error stop Profile : {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.get("/admin/profile")
+def get_profile(admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db)):
+    try:
+        # admin vertify
+        db_admin = db.query(models.Admin).filter(models.Admin.AdminIdx == admin_idx).first()
+        if not db_admin :
+            raise HTTPException(status_code=400, detail="Not Admin Auth")
+
+        return {
+            "profile": profiler.status(),
+            "slow_query_enabled": slow_query.enabled,
+            "slow_queries": list(slow_query.queries),
+        }
+    except HTTPException as http_exc:
+        # HTTPException 발생 시 로깅 후 재발생
+        logger.error(f"HTTPException: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error get Profile : {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.get("/admin/profile/stacks")
+def get_profile_stacks(admin_idx: str = Depends(auth.verify_admin_token), db: SessionLocal = Depends(get_db)):
+    try:
+        # admin vertify
+        db_admin = db.query(models.Admin).filter(models.Admin.AdminIdx == admin_idx).first()
+        if not db_admin :
+            raise HTTPException(status_code=400, detail="Not Admin Auth")
+
+        return PlainTextResponse(
+            profiler.folded(),
+            headers={"Content-Disposition": 'attachment; filename="profile.folded"'}
+        )
+    except HTTPException as http_exc:
+        # HTTPException 발생 시 로깅 후 재발생
+        logger.error(f"HTTPException: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error get Profile Stacks : {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
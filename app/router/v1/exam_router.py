@@ -3,6 +3,7 @@ from sqlalchemy import func, and_, text
 from typing import List
 from ...database import SessionLocal, get_db
 from ... import models, schema
+from ...shard import shard_router
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -13,27 +14,35 @@ router = APIRouter()
 @router.get("/exam", response_model=List[schema.ExamWithReservationCount])
 def search_exams(params: schema.ExamSearch, db: SessionLocal = Depends(get_db)):
     try:
-        future_time = func.now() + text("INTERVAL '3 HOURS'")
-        query = (
-            db.query(
-                models.Exam.ExamIdx,
-                models.Exam.Title,
-                models.Exam.ExamDatetime,
-                models.Exam.PersonnelCount,
-                func.count(models.ExamReservation.MemberIdx).label("ReservationCount")
+        def search(session):
+            future_time = func.now() + text("INTERVAL '3 HOURS'")
+            query = (
+                session.query(
+                    models.Exam.ExamIdx,
+                    models.Exam.Title,
+                    models.Exam.ExamDatetime,
+                    models.Exam.PersonnelCount,
+                    func.count(models.ExamReservation.MemberIdx).label("ReservationCount")
+                )
+                .outerjoin(models.ExamReservation, and_(
+                    models.Exam.ExamIdx == models.ExamReservation.ExamIdx,
+                    models.ExamReservation.ConfirmDatetime == None,
+                ))
+                .filter(models.Exam.ExamDatetime >= future_time)
+                .group_by(models.Exam.ExamIdx)
             )
-            .outerjoin(models.ExamReservation, and_(
-                models.Exam.ExamIdx == models.ExamReservation.ExamIdx,
-                models.ExamReservation.ConfirmDatetime == None,
-            ))
-            .filter(models.Exam.ExamDatetime >= future_time)
-            .group_by(models.Exam.ExamIdx)
+            if(params.Title):
+                query = query.filter(models.Exam.Title.contains(params.Title))
+            if(params.StartDatetime and params.EndDatetime):
+                query = query.filter(models.Exam.ExamDatetime >= params.StartDatetime).filter(models.Exam.ExamDatetime <= params.EndDatetime)
+            return query
+
+        db_result = shard_router.gather(
+            search, db,
+            key=(models.Exam.ExamDatetime, models.Exam.ExamIdx),
+            offset=(params.page - 1) * params.limit,
+            limit=params.limit
         )
-        if(params.Title):
-            query = query.filter(models.Exam.Title.contains(params.Title))
-        if(params.StartDatetime and params.EndDatetime):
-            query = query.filter(models.Exam.ExamDatetime >= params.StartDatetime).filter(models.Exam.ExamDatetime <= params.EndDatetime)
-        db_result = query.offset((params.page - 1) * params.limit).limit(params.limit).all()
 
         response = []
         for exam in db_result:
@@ -3,6 +3,8 @@ from sqlalchemy import func
 from typing import List
 from ...database import SessionLocal, get_db
 from ... import models, schema, auth
+from ...shard import shard_router, get_exam_db
+from ...waitlist import promotion_worker, clear_promoted, WAITLIST_WAITING
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -10,19 +12,21 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 시험 잠금을 기다리는 동안 이벤트 루프가 멈추지 않도록 스레드풀에서 처리
 @router.post("/reservation/{examIdx}")
-async def reservation_exam(examIdx: int, params: schema.Reservation, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db)):
+def reservation_exam(examIdx: int, params: schema.Reservation, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db), exam_db: SessionLocal = Depends(get_exam_db)):
     try:
         db_member = db.query(models.Member).filter(models.Member.MemberIdx == data).first()
         if not db_member :
             raise HTTPException(status_code=400, detail="Empty Member")
         
-        db_exam = db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
+        # 대기자 자동 배정과 동시에 자리를 채우지 않도록 시험 잠금
+        db_exam = exam_db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).with_for_update().first()
         if not db_exam:
             raise HTTPException(status_code=400, detail="Not Exists Exam Data")
         
         db_reservation = (
-            db.query(models.ExamReservation)
+            exam_db.query(models.ExamReservation)
             .filter(models.ExamReservation.MemberIdx == db_member.MemberIdx)
             .filter(models.ExamReservation.ExamIdx == db_exam.ExamIdx)
             .first()
@@ -31,13 +35,19 @@ async def reservation_exam(examIdx: int, params: schema.Reservation, data: str =
             raise HTTPException(status_code=400, detail="Already Registred Exam")
         
         db_reservation_count = (
-            db.query(func.count(models.ExamReservation.MemberIdx))
+            exam_db.query(func.count(models.ExamReservation.MemberIdx))
             .filter(models.ExamReservation.ExamIdx == db_exam.ExamIdx)
-            .filter(models.ExamReservation.ConfirmDatetime != None)
             .scalar()
         )
+        db_waiting = (
+            exam_db.query(models.ExamWaitlist.WaitlistIdx)
+            .filter(models.ExamWaitlist.ExamIdx == db_exam.ExamIdx)
+            .filter(models.ExamWaitlist.Status == WAITLIST_WAITING)
+            .first()
+        )
 
-        if(db_reservation_count > db_exam.PersonnelCount):
+        # 대기자가 있으면 빈 자리는 대기 순서대로 배정되므로 대기 신청 필요
+        if(db_reservation_count >= db_exam.PersonnelCount or db_waiting):
             raise HTTPException(status_code=400, detail="Over Exam Personnel Count")
         
         db_reservation = models.ExamReservation(
@@ -45,8 +55,8 @@ async def reservation_exam(examIdx: int, params: schema.Reservation, data: str =
             ExamIdx=db_exam.ExamIdx,
             Memo= params.Memo
         )
-        db.add(db_reservation)
-        db.commit()
+        exam_db.add(db_reservation)
+        exam_db.commit()
 
         response = schema.responseModel(result=True, code=00, message="success")
         return response
@@ -59,18 +69,18 @@ async def reservation_exam(examIdx: int, params: schema.Reservation, data: str =
         raise HTTPException(status_code=500, detail="Internal Server Error")  
    
 @router.delete("/reservation/{examIdx}")
-async def delete_reservation(examIdx: int, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db)):
+async def delete_reservation(examIdx: int, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db), exam_db: SessionLocal = Depends(get_exam_db)):
     try:
         db_member = db.query(models.Member).filter(models.Member.MemberIdx == data).first()
         if not db_member :
             raise HTTPException(status_code=400, detail="Empty Member")
         
-        db_exam = db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
+        db_exam = exam_db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
         if not db_exam:
             raise HTTPException(status_code=400, detail="Not Exists Exam Data")
         
         db_reservation = (
-            db.query(models.ExamReservation)
+            exam_db.query(models.ExamReservation)
             .filter(models.ExamReservation.MemberIdx == db_member.MemberIdx)
             .filter(models.ExamReservation.ExamIdx == db_exam.ExamIdx)
             .filter(models.ExamReservation.ConfirmDatetime == None)
@@ -79,8 +89,10 @@ async def delete_reservation(examIdx: int, data: str = Depends(auth.verify_membe
         if not db_reservation:
             raise HTTPException(status_code=400, detail="Not Exists Registred Exam")
         
-        db.delete(db_reservation)
-        db.commit()
+        exam_db.delete(db_reservation)
+        clear_promoted(exam_db, db_exam.ExamIdx, db_member.MemberIdx)
+        exam_db.commit()
+        promotion_worker.notify(db_exam.ExamIdx)
 
         response = schema.responseModel(result=True, code=00, message="success")
         return response
@@ -93,19 +105,19 @@ async def delete_reservation(examIdx: int, data: str = Depends(auth.verify_membe
         raise HTTPException(status_code=500, detail="Internal Server Error")
     
 @router.put("/reservation/{examIdx}")
-async def modify_reservation(examIdx: int, params: schema.Reservation, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db)):
+async def modify_reservation(examIdx: int, params: schema.Reservation, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db), exam_db: SessionLocal = Depends(get_exam_db)):
     try:
         db_member = db.query(models.Member).filter(models.Member.MemberIdx == data).first()
         if not db_member :
             # response = schemas.responseModel(result=False, code=91, message="Empty Member")
             raise HTTPException(status_code=400, detail="Empty Member")
         
-        db_exam = db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
+        db_exam = exam_db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
         if not db_exam:
             raise HTTPException(status_code=400, detail="Not Exists Exam Data")
         
         db_reservation = (
-            db.query(models.ExamReservation)
+            exam_db.query(models.ExamReservation)
             .filter(models.ExamReservation.MemberIdx == db_member.MemberIdx)
             .filter(models.ExamReservation.ExamIdx == db_exam.ExamIdx)
             .filter(models.ExamReservation.ConfirmDatetime == None)
@@ -115,7 +127,7 @@ async def modify_reservation(examIdx: int, params: schema.Reservation, data: str
             raise HTTPException(status_code=400, detail="Not Exists Registred Exam")
         
         db_reservation.Memo = params.Memo
-        db.commit()
+        exam_db.commit()
 
         response = schema.responseModel(result=True, code=00, message="success")
         return response
@@ -134,21 +146,24 @@ async def get_my_reservation(data: str = Depends(auth.verify_member_token), db:
         if not db_member :
             raise HTTPException(status_code=400, detail="Empty Member")
         
-        db_result = (
-            db.query(
-                models.Exam.ExamIdx,
-                models.Exam.Title,
-                models.Exam.ExamDatetime,
-                models.Exam.PersonnelCount,
-                models.ExamReservation.MemberIdx,
-                models.ExamReservation.Memo,
-                models.ExamReservation.ConfirmDatetime,
-                models.ExamReservation.RegDatetime
-            )
-            .outerjoin(models.ExamReservation, 
-                models.Exam.ExamIdx == models.ExamReservation.ExamIdx)
-            .filter(models.ExamReservation.MemberIdx == db_member.MemberIdx)
-            .all()
+        db_result = shard_router.gather(
+            lambda session: (
+                session.query(
+                    models.Exam.ExamIdx,
+                    models.Exam.Title,
+                    models.Exam.ExamDatetime,
+                    models.Exam.PersonnelCount,
+                    models.ExamReservation.MemberIdx,
+                    models.ExamReservation.Memo,
+                    models.ExamReservation.ConfirmDatetime,
+                    models.ExamReservation.RegDatetime
+                )
+                .outerjoin(models.ExamReservation, 
+                    models.Exam.ExamIdx == models.ExamReservation.ExamIdx)
+                .filter(models.ExamReservation.MemberIdx == db_member.MemberIdx)
+            ),
+            db,
+            key=(models.Exam.ExamDatetime, models.Exam.ExamIdx)
         )
 
         logger.info(f"db_result : {db_result}")
@@ -176,4 +191,129 @@ async def get_my_reservation(data: str = Depends(auth.verify_member_token), db:
     except Exception as e:
         logger.error(f"Error Create Reservation: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
- 
\ No newline at end of file
+
+@router.post("/reservation/{examIdx}/waitlist")
+async def join_waitlist(examIdx: int, params: schema.Reservation, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db), exam_db: SessionLocal = Depends(get_exam_db)):
+    try:
+        db_member = db.query(models.Member).filter(models.Member.MemberIdx == data).first()
+        if not db_member :
+            raise HTTPException(status_code=400, detail="Empty Member")
+        
+        db_exam = exam_db.query(models.Exam).filter(models.Exam.ExamIdx == examIdx).first()
+        if not db_exam:
+            raise HTTPException(status_code=400, detail="Not Exists Exam Data")
+        
+        db_reservation = (
+            exam_db.query(models.ExamReservation)
+            .filter(models.ExamReservation.MemberIdx == db_member.MemberIdx)
+            .filter(models.ExamReservation.ExamIdx == db_exam.ExamIdx)
+            .first()
+        )
+        if db_reservation:
+            raise HTTPException(status_code=400, detail="Already Registred Exam")
+        
+        db_waitlist = (
+            exam_db.query(models.ExamWaitlist)
+            .filter(models.ExamWaitlist.MemberIdx == db_member.MemberIdx)
+            .filter(models.ExamWaitlist.ExamIdx == db_exam.ExamIdx)
+            .first()
+        )
+        if db_waitlist and db_waitlist.Status == WAITLIST_WAITING:
+            raise HTTPException(status_code=400, detail="Already Waiting Exam")
+        
+        # 이전 배정 이력이 남아 있는 경우 대기 순서 맨 뒤로 다시 등록
+        if db_waitlist:
+            exam_db.delete(db_waitlist)
+            exam_db.flush()
+        
+        db_waitlist = models.ExamWaitlist(
+            MemberIdx= db_member.MemberIdx, 
+            ExamIdx=db_exam.ExamIdx,
+            Memo= params.Memo
+        )
+        exam_db.add(db_waitlist)
+        exam_db.commit()
+        promotion_worker.notify(db_exam.ExamIdx)
+
+        response = schema.responseModel(result=True, code=00, message="success")
+        return response
+    except HTTPException as http_exc:
+        # HTTPException 발생 시 로깅 후 재발생
+        logger.error(f"HTTPException: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error Create Waitlist: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.delete("/reservation/{examIdx}/waitlist")
+async def delete_waitlist(examIdx: int, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db), exam_db: SessionLocal = Depends(get_exam_db)):
+    try:
+        db_member = db.query(models.Member).filter(models.Member.MemberIdx == data).first()
+        if not db_member :
+            raise HTTPException(status_code=400, detail="Empty Member")
+        
+        db_waitlist = (
+            exam_db.query(models.ExamWaitlist)
+            .filter(models.ExamWaitlist.MemberIdx == db_member.MemberIdx)
+            .filter(models.ExamWaitlist.ExamIdx == examIdx)
+            .filter(models.ExamWaitlist.Status == WAITLIST_WAITING)
+            .first()
+        )
+        if not db_waitlist:
+            raise HTTPException(status_code=400, detail="Not Exists Waitlist")
+        
+        exam_db.delete(db_waitlist)
+        exam_db.commit()
+
+        response = schema.responseModel(result=True, code=00, message="success")
+        return response
+    except HTTPException as http_exc:
+        # HTTPException 발생 시 로깅 후 재발생
+        logger.error(f"HTTPException: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error Delete Waitlist: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.get("/reservation/{examIdx}/waitlist", response_model=schema.WaitlistStatus)
+async def get_waitlist_status(examIdx: int, data: str = Depends(auth.verify_member_token), db: SessionLocal = Depends(get_db), exam_db: SessionLocal = Depends(get_exam_db)):
+    try:
+        db_member = db.query(models.Member).filter(models.Member.MemberIdx == data).first()
+        if not db_member :
+            raise HTTPException(status_code=400, detail="Empty Member")
+        
+        db_waitlist = (
+            exam_db.query(models.ExamWaitlist)
+            .filter(models.ExamWaitlist.MemberIdx == db_member.MemberIdx)
+            .filter(models.ExamWaitlist.ExamIdx == examIdx)
+            .first()
+        )
+        if not db_waitlist:
+            raise HTTPException(status_code=400, detail="Not Exists Waitlist")
+        
+        # 대기 중이면 현재 대기 순번
+        position = None
+        if db_waitlist.Status == WAITLIST_WAITING:
+            position = (
+                exam_db.query(func.count(models.ExamWaitlist.WaitlistIdx))
+                .filter(models.ExamWaitlist.ExamIdx == examIdx)
+                .filter(models.ExamWaitlist.Status == WAITLIST_WAITING)
+                .filter(models.ExamWaitlist.WaitlistIdx <= db_waitlist.WaitlistIdx)
+                .scalar()
+            )
+
+        return schema.WaitlistStatus(
+            ExamIdx= db_waitlist.ExamIdx,
+            MemberIdx= db_waitlist.MemberIdx,
+            Status= db_waitlist.Status,
+            Position= position,
+            PromotedDatetime= db_waitlist.PromotedDatetime,
+            RegDatetime= db_waitlist.RegDatetime
+        )
+    except HTTPException as http_exc:
+        # HTTPException 발생 시 로깅 후 재발생
+        logger.error(f"HTTPException: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error get Waitlist: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
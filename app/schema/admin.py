@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class AdminBase(BaseModel):
     Id: str
@@ -17,4 +18,11 @@ class Admin(AdminBase):
 
 class AdminLogin(BaseModel):
     Id: str
-    Password: str
\ No newline at end of file
+    Password: str
+
+class ProfileStart(BaseModel):
+    Count: int = 10
+    Route: Optional[str] = None
+    LatencyThresholdMs: int = 0
+    IntervalMs: int = 5
+    SqlThresholdMs: Optional[int] = None
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 
 class Reservation(BaseModel):
@@ -8,3 +9,11 @@ class Reservation(BaseModel):
 class AdminReservation(BaseModel):
     Memo: str = None
     ConfirmDatetime: datetime = None
+
+class WaitlistStatus(BaseModel):
+    ExamIdx: int
+    MemberIdx: int
+    Status: str
+    Position: Optional[int] = None
+    PromotedDatetime: Optional[datetime] = None
+    RegDatetime: Optional[datetime] = None
@@ -0,0 +1,195 @@
+import bisect
+import hashlib
+import heapq
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+from fastapi import Depends
+from sqlalchemy import create_engine, insert, select, exists, literal, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from .database import engine, SessionLocal, SQLALCHEMY_DATABASE_URL, SHARD_DATABASE_URLS, get_db
+from . import models
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 샤드 하나당 링에 올리는 가상 노드 수
+VIRTUAL_NODES = 100
+# 동기 라우트를 처리하는 요청 스레드풀 크기 (anyio 기본값)
+REQUEST_THREADPOOL_SIZE = 40
+
+def _hash(value: str) -> int:
+    return int(hashlib.md5(value.encode()).hexdigest()[:16], 16)
+
+class HashRing:
+    def __init__(self, shard_count: int, vnodes: int = VIRTUAL_NODES):
+        self.ring = sorted(
+            (_hash(f"shard-{shard}-{vnode}"), shard)
+            for shard in range(shard_count)
+            for vnode in range(vnodes)
+        )
+        self.keys = [key for key, _ in self.ring]
+
+    def get(self, key) -> int:
+        idx = bisect.bisect(self.keys, _hash(str(key))) % len(self.keys)
+        return self.ring[idx][1]
+
+class ShardRouter:
+    """ExamIdx 기준으로 시험/예약 데이터를 샤드 DB 로 라우팅
+
+    Member, Admin, ExamShard(샤드 맵) 는 기본 DB 에 두고,
+    Exam 과 ExamReservation 은 ExamIdx 가 속한 샤드에 함께 저장한다.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.engines = []
+        self.sessions = []
+        for url in urls:
+            if url == SQLALCHEMY_DATABASE_URL:
+                self.engines.append(engine)
+                self.sessions.append(SessionLocal)
+            else:
+                shard_engine = create_engine(url, pool_pre_ping=True)
+                self.engines.append(shard_engine)
+                self.sessions.append(sessionmaker(autocommit=False, autoflush=False, bind=shard_engine))
+        # 신규 시험만 해시 링으로 배정 (기본 DB 가 샤드 목록에 없으면 기존 데이터 조회용으로만 추가)
+        self.ring = HashRing(len(urls))
+        if engine not in self.engines:
+            self.engines.append(engine)
+            self.sessions.append(SessionLocal)
+        self.main_shard = self.engines.index(engine)
+        # 동시에 처리 중인 요청마다 모든 샤드를 병렬 조회할 수 있도록
+        self.executor = ThreadPoolExecutor(
+            max_workers=len(self.engines) * REQUEST_THREADPOOL_SIZE,
+            thread_name_prefix="shard-scatter"
+        )
+        # ExamIdx -> ShardIdx 캐시 (한번 배정된 샤드는 바뀌지 않음)
+        self.shard_map = {}
+
+    @property
+    def count(self) -> int:
+        return len(self.engines)
+
+    def create_all(self):
+        for shard_engine in self.engines:
+            models.Base.metadata.create_all(bind=shard_engine)
+        self.init_shard_map()
+
+    def init_shard_map(self):
+        """샤딩 이전에 기본 DB 에 등록된 시험을 샤드 맵에 기본 DB 샤드로 등록
+
+        ExamShard 에서 발급하는 ExamIdx 가 기존 시험과 겹치지 않도록 시퀀스도 맞춘다.
+        """
+        db = SessionLocal()
+        try:
+            db.execute(
+                insert(models.ExamShard).from_select(
+                    ["ExamIdx", "ShardIdx"],
+                    select(models.Exam.ExamIdx, literal(self.main_shard))
+                    .where(~exists().where(models.ExamShard.ExamIdx == models.Exam.ExamIdx))
+                )
+            )
+            if engine.dialect.name == "postgresql":
+                db.execute(text(
+                    """SELECT setval(pg_get_serial_sequence('"ExamShard"', 'ExamIdx'), """
+                    """COALESCE((SELECT MAX("ExamIdx") FROM "ExamShard"), 0) + 1, false)"""
+                ))
+            db.commit()
+        except IntegrityError:
+            # 다른 worker 가 먼저 등록한 경우
+            db.rollback()
+        finally:
+            db.close()
+
+    def shard_for(self, exam_idx: int, db) -> int:
+        if self.count == 1:
+            return 0
+        if exam_idx in self.shard_map:
+            return self.shard_map[exam_idx]
+
+        db_shard = db.query(models.ExamShard).filter(models.ExamShard.ExamIdx == exam_idx).first()
+        if not db_shard:
+            # 샤드 맵에 없는 시험은 기본 DB 에 있는 것으로 간주 (캐시하지 않음)
+            return self.main_shard
+        self.shard_map[exam_idx] = db_shard.ShardIdx
+        return db_shard.ShardIdx
+
+    def session(self, shard_idx: int, db):
+        # 기본 DB 와 같은 샤드는 요청의 세션을 그대로 사용
+        if self.engines[shard_idx] is engine:
+            return db, False
+        return self.sessions[shard_idx](), True
+
+    def scatter(self, fn: Callable, db) -> list:
+        """모든 샤드에서 fn(session) 을 병렬 실행한 결과 목록"""
+        if self.count == 1:
+            return [fn(db)]
+
+        def run(shard_idx):
+            session, owned = self.session(shard_idx, db)
+            try:
+                return fn(session)
+            finally:
+                if owned:
+                    session.close()
+
+        return list(self.executor.map(run, range(self.count)))
+
+    def gather(self, fn: Callable, db, key: tuple, offset: int = 0, limit: int = None) -> list:
+        """샤드별 fn(session) 쿼리 결과를 key 순으로 병합하여 offset/limit 만큼 반환"""
+        if self.count == 1:
+            query = fn(db).order_by(None).order_by(*key)
+            if limit is not None:
+                query = query.offset(offset).limit(limit)
+            return query.all()
+
+        def fetch(session):
+            # 각 샤드에서는 병합에 필요한 앞부분(offset + limit)만 가져옴
+            query = fn(session).order_by(None).order_by(*key)
+            if limit is not None:
+                query = query.limit(offset + limit)
+            return query.all()
+
+        sort_key = lambda row: tuple(getattr(row, column.key) for column in key)
+        merged = heapq.merge(*self.scatter(fetch, db), key=sort_key)
+        stop = offset + limit if limit is not None else None
+        return list(islice(merged, offset, stop))
+
+    def add_exam(self, db, db_exam: models.Exam) -> models.Exam:
+        # 샤드 맵에서 전역 ExamIdx 를 발급받은 뒤 해시 링으로 샤드 결정
+        db_shard = models.ExamShard(ShardIdx=0)
+        db.add(db_shard)
+        db.flush()
+        db_shard.ShardIdx = self.ring.get(db_shard.ExamIdx)
+        db.commit()
+
+        shard_db, owned = self.session(db_shard.ShardIdx, db)
+        try:
+            db_exam.ExamIdx = db_shard.ExamIdx
+            shard_db.add(db_exam)
+            shard_db.commit()
+            shard_db.refresh(db_exam)
+        except Exception:
+            shard_db.rollback()
+            db.delete(db_shard)
+            db.commit()
+            raise
+        finally:
+            if owned:
+                shard_db.close()
+
+        self.shard_map[db_shard.ExamIdx] = db_shard.ShardIdx
+        logger.info(f"Exam {db_exam.ExamIdx} -> shard {db_shard.ShardIdx}")
+        return db_exam
+
+shard_router = ShardRouter(SHARD_DATABASE_URLS)
+
+def get_exam_db(examIdx: int, db = Depends(get_db)):
+    shard_db, owned = shard_router.session(shard_router.shard_for(examIdx, db), db)
+    try:
+        yield shard_db
+    finally:
+        if owned:
+            shard_db.close()
@@ -0,0 +1,186 @@
+import time
+import uuid
+import threading
+from datetime import datetime
+from collections import defaultdict
+from sqlalchemy import select, update, insert, func, and_, exists
+from .database import SessionLocal
+from .config import WAITLIST_PROMOTION_INTERVAL_SECONDS, WAITLIST_BATCH_DELAY_MS
+from .shard import shard_router
+from . import models
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WAITLIST_WAITING = "WAITING"
+WAITLIST_PROMOTED = "PROMOTED"
+
+def promote_waitlist(db, exam_idxs: list, skip_locked: bool = False) -> int:
+    """빈 자리만큼 대기자를 대기 순서대로 예약으로 전환 (한 트랜잭션)
+
+    시험 수, 대기자 수와 상관없이 잠금/상태 변경/예약 생성 3 개 쿼리로 처리한다.
+    skip_locked 이면 다른 트랜잭션(직접 예약 등)이 잠근 시험은 기다리지 않고 건너뛴다.
+    """
+    Exam, Reservation, Waitlist = models.Exam, models.ExamReservation, models.ExamWaitlist
+    try:
+        # 같은 시험의 직접 예약과 동시에 자리를 채우지 않도록 시험 잠금
+        # (여러 worker 가 겹치는 시험을 처리해도 교착 상태가 없도록 ExamIdx 순서로)
+        exam_idxs = db.execute(
+            select(Exam.ExamIdx)
+            .where(Exam.ExamIdx.in_(exam_idxs))
+            .order_by(Exam.ExamIdx)
+            .with_for_update(skip_locked=skip_locked)
+        ).scalars().all()
+        if not exam_idxs:
+            db.commit()
+            return 0
+
+        free = (
+            select(
+                Exam.ExamIdx,
+                (Exam.PersonnelCount - func.count(Reservation.MemberIdx)).label("FreeCount")
+            )
+            .outerjoin(Reservation, Exam.ExamIdx == Reservation.ExamIdx)
+            .where(Exam.ExamIdx.in_(exam_idxs))
+            .group_by(Exam.ExamIdx, Exam.PersonnelCount)
+            .subquery()
+        )
+        ranked = (
+            select(
+                Waitlist.WaitlistIdx,
+                Waitlist.ExamIdx,
+                func.row_number().over(partition_by=Waitlist.ExamIdx, order_by=Waitlist.WaitlistIdx).label("Rank")
+            )
+            .where(Waitlist.Status == WAITLIST_WAITING)
+            .where(Waitlist.ExamIdx.in_(exam_idxs))
+            .where(~exists().where(and_(
+                Reservation.ExamIdx == Waitlist.ExamIdx,
+                Reservation.MemberIdx == Waitlist.MemberIdx,
+            )))
+            .subquery()
+        )
+        promotion_token = uuid.uuid4().hex
+        result = db.execute(
+            update(Waitlist)
+            .where(Waitlist.WaitlistIdx.in_(
+                select(ranked.c.WaitlistIdx)
+                .join(free, free.c.ExamIdx == ranked.c.ExamIdx)
+                .where(ranked.c.Rank <= free.c.FreeCount)
+            ))
+            .values(Status=WAITLIST_PROMOTED, PromotedDatetime=datetime.utcnow(), PromotionToken=promotion_token)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            insert(Reservation).from_select(
+                ["MemberIdx", "ExamIdx", "Memo"],
+                select(Waitlist.MemberIdx, Waitlist.ExamIdx, Waitlist.Memo)
+                .where(Waitlist.PromotionToken == promotion_token)
+            )
+        )
+        db.commit()
+        return result.rowcount
+    except Exception:
+        db.rollback()
+        raise
+
+def clear_promoted(db, exam_idx: int, member_idx: int):
+    """배정된 예약이 취소/삭제될 때 배정 이력 삭제 (대기 상태 조회가 PROMOTED 로 남지 않도록)
+
+    예약 삭제와 같은 트랜잭션에서 commit 한다.
+    """
+    (
+        db.query(models.ExamWaitlist)
+        .filter(models.ExamWaitlist.ExamIdx == exam_idx)
+        .filter(models.ExamWaitlist.MemberIdx == member_idx)
+        .filter(models.ExamWaitlist.Status == WAITLIST_PROMOTED)
+        .delete(synchronize_session=False)
+    )
+
+class PromotionWorker:
+    """예약 취소 시 대기자를 자동으로 예약 전환하는 백그라운드 작업
+
+    notify 된 시험을 WAITLIST_BATCH_DELAY_MS 동안 모아 샤드별로 한번에 처리하고,
+    누락된 알림을 위해 주기적으로 빈 자리와 대기자가 모두 있는 시험을 확인한다.
+    직접 예약 중인 시험은 기다리지 않고 건너뛰며 다음 주기에 다시 확인한다.
+    """
+
+    def __init__(self, interval: float, batch_delay: float):
+        self.interval = interval
+        self.batch_delay = batch_delay
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, name="waitlist-promotion", daemon=True)
+        self.thread.start()
+
+    def notify(self, exam_idx: int):
+        with self.lock:
+            self.pending.add(exam_idx)
+        self.wakeup.set()
+
+    def _run(self):
+        while True:
+            notified = self.wakeup.wait(self.interval)
+            if notified:
+                # 연속된 취소를 모아서 처리
+                time.sleep(self.batch_delay)
+            self.wakeup.clear()
+            with self.lock:
+                exam_idxs, self.pending = self.pending, set()
+            try:
+                self.promote(exam_idxs if notified else None)
+            except Exception as e:
+                logger.error(f"Error promote Waitlist : {e}")
+                with self.lock:
+                    self.pending |= exam_idxs
+
+    def promote(self, exam_idxs=None):
+        by_shard = defaultdict(list)
+        db = SessionLocal()
+        try:
+            if exam_idxs is None:
+                for shard_idx, shard_exam_idxs in enumerate(shard_router.scatter(self._waiting_exams, db)):
+                    by_shard[shard_idx].extend(shard_exam_idxs)
+            else:
+                for exam_idx in exam_idxs:
+                    by_shard[shard_router.shard_for(exam_idx, db)].append(exam_idx)
+
+            for shard_idx, shard_exam_idxs in by_shard.items():
+                if not shard_exam_idxs:
+                    continue
+                shard_db, owned = shard_router.session(shard_idx, db)
+                try:
+                    promoted = promote_waitlist(shard_db, shard_exam_idxs, skip_locked=True)
+                finally:
+                    if owned:
+                        shard_db.close()
+                if promoted:
+                    logger.info(f"Waitlist promoted : shard {shard_idx}, {promoted} members")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _waiting_exams(session) -> list:
+        # 정원이 찬 시험은 배정할 수 없으므로 잠그지 않도록 제외
+        reservation_count = (
+            select(func.count(models.ExamReservation.MemberIdx))
+            .where(models.ExamReservation.ExamIdx == models.Exam.ExamIdx)
+            .scalar_subquery()
+        )
+        return [
+            exam_idx for exam_idx, in
+            session.query(models.ExamWaitlist.ExamIdx)
+            .join(models.Exam, models.Exam.ExamIdx == models.ExamWaitlist.ExamIdx)
+            .filter(models.ExamWaitlist.Status == WAITLIST_WAITING)
+            .filter(models.Exam.PersonnelCount > reservation_count)
+            .distinct()
+            .all()
+        ]
+
+promotion_worker = PromotionWorker(WAITLIST_PROMOTION_INTERVAL_SECONDS, WAITLIST_BATCH_DELAY_MS / 1000)
@@ -0,0 +1,101 @@
+"""샤드 수(1, 2, 4)에 따른 예약 쓰기/시험 목록 조회 처리량 비교
+
+샤드마다 별도의 SQLite 파일을 사용한다 (DB 파일 단위로 쓰기 잠금이 걸리므로
+샤드를 늘리면 동시 쓰기가 나뉘어 처리된다). 기본 DB 가 0 번 샤드이므로
+샤드 1 개는 샤딩 이전과 같은 단일 DB 구성이다.
+
+    python bench/shard_bench.py --shards 1 2 4 --threads 16 --ops 4000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+WORKDIR = tempfile.mkdtemp(prefix="shard_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'main.db')}"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import logging
+logging.disable(logging.CRITICAL)
+
+from app import database, models
+from app.shard import ShardRouter
+
+database.engine.echo = False
+
+def build_router(shard_count: int, exam_count: int) -> ShardRouter:
+    # 이전 구성에서 기본 DB 에 등록된 시험/샤드 맵 정리
+    models.Base.metadata.drop_all(bind=database.engine)
+    urls = [database.SQLALCHEMY_DATABASE_URL] + [
+        f"sqlite:///{os.path.join(WORKDIR, f'bench{shard_count}_{idx}.db')}" for idx in range(1, shard_count)
+    ]
+    router = ShardRouter(urls)
+    assert router.count == shard_count
+    router.create_all()
+    db = database.SessionLocal()
+    try:
+        for idx in range(exam_count):
+            router.add_exam(db, models.Exam(
+                Title=f"exam{idx}",
+                ExamDatetime=datetime.datetime(2030, 1, 1) + datetime.timedelta(hours=idx),
+                PersonnelCount=100000
+            ))
+    finally:
+        db.close()
+    return router
+
+def bench_writes(router: ShardRouter, exam_idxs: list, threads: int, ops: int) -> float:
+    def reserve(member_idx):
+        exam_idx = random.choice(exam_idxs)
+        shard_db = router.sessions[router.shard_map[exam_idx]]()
+        try:
+            shard_db.add(models.ExamReservation(MemberIdx=member_idx, ExamIdx=exam_idx, Memo=""))
+            shard_db.commit()
+        finally:
+            shard_db.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(reserve, range(1, ops + 1)))
+    return ops / (time.perf_counter() - start)
+
+def bench_reads(router: ShardRouter, threads: int, queries: int) -> float:
+    key = (models.Exam.ExamDatetime, models.Exam.ExamIdx)
+
+    def search(page):
+        db = database.SessionLocal()
+        try:
+            return router.gather(
+                lambda session: session.query(models.Exam.ExamIdx, models.Exam.ExamDatetime),
+                db, key=key, offset=(page % 5) * 10, limit=10
+            )
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(search, range(queries)))
+    return queries / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=4000)
+    parser.add_argument("--exams", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'shards':>6} {'writes/s':>10} {'reads/s':>10}")
+    for shard_count in args.shards:
+        router = build_router(shard_count, args.exams)
+        exam_idxs = list(router.shard_map)
+        writes = bench_writes(router, exam_idxs, args.threads, args.ops)
+        reads = bench_reads(router, args.threads, args.ops // 4)
+        print(f"{shard_count:>6} {writes:>10.0f} {reads:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# app.database 가 import 시점에 엔진을 만들므로 먼저 테스트용 SQLite 지정
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'main.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
@@ -0,0 +1,104 @@
+import time
+import asyncio
+from app.limiter import ConcurrencyLimiter, LoadShedMiddleware, route_key, PRIORITY_CRITICAL, PRIORITY_LOW
+
+# 가짜 서버 : worker CAPACITY 개가 요청마다 SERVICE_TIME 씩 처리, 나머지는 대기열에서 기다림
+CAPACITY = 10
+SERVICE_TIME = 0.05
+CAPACITY_RPS = CAPACITY / SERVICE_TIME
+# 이 시간 안에 응답을 받은 요청만 처리된 것으로 봄 (클라이언트 timeout)
+CLIENT_TIMEOUT = SERVICE_TIME * 5
+
+def test_route_key_groups_ids():
+    assert route_key("POST", "/v1/reservation/3") == "POST /v1/reservation/{id}"
+    assert route_key("DELETE", "/v1/admin/reservation/3/15") == "DELETE /v1/admin/reservation/{id}/{id}"
+
+def test_slow_route_does_not_lower_limit():
+    limiter = ConcurrencyLimiter(20, 4, 200, 0.5)
+    for idx in range(510):
+        if idx % 50 == 0:
+            route, latency = "GET /v1/admin/reservation", 2.0
+            limiter.last_decrease = 0.0
+        else:
+            route, latency = "GET /v1/users/my", 0.01
+        assert limiter.acquire(PRIORITY_CRITICAL)
+        limiter.release(route, latency)
+    assert limiter.limit >= 20
+
+def test_slowdown_against_baseline_lowers_limit():
+    limiter = ConcurrencyLimiter(20, 4, 200, 0.5)
+    for latency in (0.05, 0.05, 1.0):
+        limiter.acquire(PRIORITY_CRITICAL)
+        limiter.release("GET /v1/users/my", latency)
+    assert limiter.limit < 20
+
+def limited():
+    return ConcurrencyLimiter(20, 4, 200, SERVICE_TIME * 2)
+
+def unlimited():
+    return ConcurrencyLimiter(100000, 100000, 100000, 1e9)
+
+def run_load(limiter: ConcurrencyLimiter, rate: float, duration: float = 2.0):
+    async def main():
+        workers = asyncio.Semaphore(CAPACITY)
+
+        async def app(scope, receive, send):
+            async with workers:
+                await asyncio.sleep(SERVICE_TIME)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = LoadShedMiddleware(app, limiter)
+        ok = {PRIORITY_CRITICAL: 0, PRIORITY_LOW: 0}
+        sent = {PRIORITY_CRITICAL: 0, PRIORITY_LOW: 0}
+
+        async def request(priority, method, path):
+            status = {}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+
+            scope = {"type": "http", "method": method, "path": path, "headers": [], "query_string": b""}
+            sent[priority] += 1
+            start = time.monotonic()
+            await middleware(scope, None, send)
+            if status["code"] == 200 and time.monotonic() - start <= CLIENT_TIMEOUT:
+                ok[priority] += 1
+
+        tasks = []
+        start = time.monotonic()
+        idx = 0
+        while time.monotonic() - start < duration:
+            idx += 1
+            # 예약(critical) 과 시험 목록(low) 을 절반씩
+            if idx % 2:
+                tasks.append(asyncio.create_task(request(PRIORITY_LOW, "GET", "/v1/exam")))
+            else:
+                tasks.append(asyncio.create_task(request(PRIORITY_CRITICAL, "POST", "/v1/reservation/1")))
+            await asyncio.sleep(1 / rate)
+        # timeout 이 지나도 끝나지 않은 요청은 실패이므로 기다리지 않음
+        _, pending = await asyncio.wait(tasks, timeout=CLIENT_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        return ok, sent
+
+    ok, sent = asyncio.run(main())
+    return sum(ok.values()) / duration, ok, sent
+
+def test_goodput_stays_flat_at_3x_capacity():
+    goodput_1x, _, _ = run_load(limited(), CAPACITY_RPS)
+    limiter = limited()
+    goodput_3x, ok, sent = run_load(limiter, CAPACITY_RPS * 3)
+    # limit 이 없으면 대기열이 계속 늘어나 대부분 timeout
+    goodput_unlimited, _, _ = run_load(unlimited(), CAPACITY_RPS * 3)
+
+    assert goodput_3x >= CAPACITY_RPS * 0.75
+    assert goodput_3x >= goodput_1x * 0.9
+    assert goodput_unlimited < CAPACITY_RPS * 0.3
+    assert goodput_unlimited < goodput_3x * 0.3
+
+    # 목록 조회(low) 가 먼저 거절되고 예약(critical) 은 대부분 처리
+    assert limiter.shed[PRIORITY_LOW] > limiter.shed[PRIORITY_CRITICAL]
+    assert ok[PRIORITY_CRITICAL] / sent[PRIORITY_CRITICAL] > 0.8
+    assert ok[PRIORITY_LOW] / sent[PRIORITY_LOW] < ok[PRIORITY_CRITICAL] / sent[PRIORITY_CRITICAL]
@@ -0,0 +1,94 @@
+import time
+import threading
+from sqlalchemy import create_engine
+from app.profiler import RequestProfiler, SlowQueryCapture
+from app.waitlist import PromotionWorker
+
+def test_background_threads_are_not_sampled():
+    worker = PromotionWorker(interval=60, batch_delay=0)
+    worker.start()
+
+    # 스레드풀에서 동기 라우트를 처리 중인 것처럼 app 모듈 함수 안에서 대기
+    done = threading.Event()
+    handler = {"__name__": "app.router.v1.fake_router", "done": done, "time": time}
+    exec("def get_items():\n    while not done.is_set():\n        time.sleep(0.001)", handler)
+    request_thread = threading.Thread(target=handler["get_items"], name="AnyIO worker thread", daemon=True)
+    request_thread.start()
+
+    profiler = RequestProfiler()
+    profiler.start(1, interval_ms=1)
+    key = profiler.begin("GET", "/v1/admin/reservation")
+    time.sleep(0.05)
+    stacks = [stack for _, stack, _ in profiler.samples]
+    profiler.end(key)
+    done.set()
+
+    assert stacks
+    assert all("app.router.v1.fake_router:get_items" in stack for stack in stacks)
+    assert not any("app.waitlist:_run" in stack for stack in stacks)
+
+    result = profiler.status()["requests"][0]
+    assert result["samples"] == len(stacks)
+    assert result["categories"] == {"handler": len(stacks)}
+    assert "app.router.v1.fake_router:get_items" in profiler.folded()
+    assert "app.waitlist" not in profiler.folded()
+
+def test_failed_explain_keeps_request_transaction(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'explain.db'}")
+    capture = SlowQueryCapture()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("CREATE TABLE item (id INTEGER PRIMARY KEY)")
+        conn.commit()
+
+        conn.exec_driver_sql("INSERT INTO item (id) VALUES (1)")
+        assert capture._explain(conn, "SELECT * FROM missing_table", ()) is None
+        assert capture._explain(conn, "SAVEPOINT sp", ()) is None
+        assert capture._explain(conn, "SELECT * FROM item WHERE id = ?", (1,)) is not None
+        conn.commit()
+
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM item").scalar() == 1
+
+def test_start_profile_rejects_invalid_params():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    client.post("/v1/admin/users", json={"Id": "profile_admin", "Name": "admin", "Password": "pw"})
+    token = client.post("/v1/admin/login", json={"Id": "profile_admin", "Password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/v1/admin/profile", json={"Count": 1, "IntervalMs": 0}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid Profile Interval"
+
+    response = client.post("/v1/admin/profile", json={"Count": 1, "Route": "admin/("}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid Profile Route"
+
+    response = client.post("/v1/admin/profile", json={"Count": 1, "SqlThresholdMs": 0}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid Profile Sql Threshold"
+
+def test_slow_query_capture_stops_with_profiler():
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app.main import app
+    from app.profiler import profiler, slow_query
+
+    client = TestClient(app)
+    client.post("/v1/admin/users", json={"Id": "profile_sql_admin", "Name": "admin", "Password": "pw"})
+    token = client.post("/v1/admin/login", json={"Id": "profile_sql_admin", "Password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/v1/admin/profile", json={"Count": 2, "SqlThresholdMs": 1}, headers=headers)
+    assert response.status_code == 200
+    assert slow_query.enabled
+
+    client.get("/v1/admin/limiter", headers=headers)
+    assert slow_query.enabled
+    client.get("/v1/admin/limiter", headers=headers)
+
+    assert not profiler.enabled
+    assert not slow_query.enabled
+    assert not event.contains(Engine, "after_cursor_execute", slow_query._after_execute)
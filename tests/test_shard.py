@@ -0,0 +1,66 @@
+import datetime
+import pytest
+from collections import Counter
+from app import models
+from app.shard import HashRing, ShardRouter
+
+def test_hash_ring_is_deterministic():
+    ring = HashRing(4)
+    assert [ring.get(exam_idx) for exam_idx in range(100)] == [HashRing(4).get(exam_idx) for exam_idx in range(100)]
+
+def test_hash_ring_spreads_keys():
+    counts = Counter(HashRing(4).get(exam_idx) for exam_idx in range(10000))
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > 10000 / 4 * 0.7
+
+def test_hash_ring_moves_few_keys_when_adding_shard():
+    before, after = HashRing(3), HashRing(4)
+    moved = [exam_idx for exam_idx in range(10000) if before.get(exam_idx) != after.get(exam_idx)]
+    # 새 샤드로 옮겨가는 키만 이동
+    assert all(after.get(exam_idx) == 3 for exam_idx in moved)
+    assert len(moved) < 10000 * 0.4
+
+@pytest.fixture
+def router(tmp_path):
+    router = ShardRouter([f"sqlite:///{tmp_path / f'shard{idx}.db'}" for idx in range(3)])
+    router.create_all()
+    return router
+
+def add_exams(router, count):
+    for idx in range(count):
+        db = router.sessions[router.main_shard]()
+        try:
+            router.add_exam(db, models.Exam(
+                Title=f"exam{idx}",
+                ExamDatetime=datetime.datetime(2030, 1, 1) + datetime.timedelta(hours=count - idx),
+                PersonnelCount=10
+            ))
+        finally:
+            db.close()
+
+def search(session):
+    return session.query(models.Exam.ExamIdx, models.Exam.ExamDatetime)
+
+def test_add_exam_spreads_across_shards(router):
+    add_exams(router, 30)
+    assert len(set(router.shard_map.values())) == 3
+    counts = router.scatter(lambda session: session.query(models.Exam).count(), router.sessions[router.main_shard]())
+    assert sum(counts) == 30
+
+def test_gather_merges_pages_in_order(router):
+    add_exams(router, 25)
+    db = router.sessions[router.main_shard]()
+    key = (models.Exam.ExamDatetime, models.Exam.ExamIdx)
+
+    expected = sorted(row.ExamDatetime for row in router.gather(search, db, key=key))
+    assert len(expected) == 25
+
+    pages = [router.gather(search, db, key=key, offset=(page - 1) * 10, limit=10) for page in (1, 2, 3)]
+    assert [len(rows) for rows in pages] == [10, 10, 5]
+    assert [row.ExamDatetime for rows in pages for row in rows] == expected
+    db.close()
+
+def test_unmapped_exam_routes_to_main_shard(router):
+    db = router.sessions[router.main_shard]()
+    assert router.shard_for(12345, db) == router.main_shard
+    db.close()
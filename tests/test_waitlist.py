@@ -0,0 +1,174 @@
+import time
+import datetime
+import pytest
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.waitlist import promote_waitlist, PromotionWorker, WAITLIST_WAITING, WAITLIST_PROMOTED
+
+# ExamIdx : (정원, 기존 예약 수)
+EXAMS = {1: (3, 3), 2: (5, 1), 3: (2, 2), 4: (4, 6)}
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'waitlist.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    for exam_idx, (personnel_count, reserved) in EXAMS.items():
+        session.add(models.Exam(
+            ExamIdx=exam_idx,
+            Title=f"exam{exam_idx}",
+            ExamDatetime=datetime.datetime(2030, 1, exam_idx),
+            PersonnelCount=personnel_count
+        ))
+        for member_idx in range(1, reserved + 1):
+            session.add(models.ExamReservation(MemberIdx=member_idx, ExamIdx=exam_idx))
+    session.flush()
+
+    # 시험별 대기 순서가 섞이도록 번갈아 등록 (대기 회원은 100 번부터)
+    for member_idx in range(100, 108):
+        for exam_idx in EXAMS:
+            session.add(models.ExamWaitlist(ExamIdx=exam_idx, MemberIdx=member_idx, Status=WAITLIST_WAITING))
+            session.flush()
+    session.commit()
+
+    yield session
+    session.close()
+
+def reservation_count(db, exam_idx):
+    return db.query(func.count(models.ExamReservation.MemberIdx)).filter(models.ExamReservation.ExamIdx == exam_idx).scalar()
+
+def waitlist(db, exam_idx):
+    return (
+        db.query(models.ExamWaitlist)
+        .filter(models.ExamWaitlist.ExamIdx == exam_idx)
+        .order_by(models.ExamWaitlist.WaitlistIdx)
+        .all()
+    )
+
+def cancel(db, exam_idx, member_idxs):
+    (
+        db.query(models.ExamReservation)
+        .filter(models.ExamReservation.ExamIdx == exam_idx)
+        .filter(models.ExamReservation.MemberIdx.in_(member_idxs))
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+
+def test_promotes_in_waitlist_order_within_capacity(db):
+    cancel(db, 1, [1, 2])
+    cancel(db, 3, [1])
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    promoted = promote_waitlist(db, list(EXAMS))
+
+    # 잠금, 대기자 상태 변경, 예약 생성
+    assert len(statements) == 3
+    # 시험 1 : 2 자리, 시험 2 : 4 자리, 시험 3 : 1 자리, 시험 4 : 정원 초과
+    assert promoted == 2 + 4 + 1
+
+    for exam_idx, (personnel_count, _) in EXAMS.items():
+        rows = waitlist(db, exam_idx)
+        statuses = [row.Status for row in rows]
+        promoted_count = statuses.count(WAITLIST_PROMOTED)
+        # 대기 순서 앞쪽부터 배정
+        assert statuses == [WAITLIST_PROMOTED] * promoted_count + [WAITLIST_WAITING] * (len(rows) - promoted_count)
+
+        reserved = {
+            member_idx for member_idx, in
+            db.query(models.ExamReservation.MemberIdx).filter(models.ExamReservation.ExamIdx == exam_idx)
+        }
+        assert {row.MemberIdx for row in rows[:promoted_count]} <= reserved
+        assert not {row.MemberIdx for row in rows[promoted_count:]} & reserved
+
+    assert [reservation_count(db, exam_idx) for exam_idx in EXAMS] == [3, 5, 2, 6]
+
+def test_no_free_seats_promotes_nobody(db):
+    assert promote_waitlist(db, list(EXAMS)) == 4
+    assert promote_waitlist(db, list(EXAMS)) == 0
+    assert [reservation_count(db, exam_idx) for exam_idx in EXAMS] == [3, 5, 2, 6]
+
+def test_repeated_cancellations_keep_order(db):
+    promoted_members = []
+    for member_idx in (1, 2, 3):
+        cancel(db, 1, [member_idx])
+        promote_waitlist(db, [1])
+        promoted_members = [row.MemberIdx for row in waitlist(db, 1) if row.Status == WAITLIST_PROMOTED]
+        assert reservation_count(db, 1) == 3
+    assert promoted_members == [100, 101, 102]
+
+def test_sweep_skips_full_exams(db):
+    # 시험 2 만 빈 자리가 있음
+    assert PromotionWorker._waiting_exams(db) == [2]
+    cancel(db, 1, [1])
+    assert sorted(PromotionWorker._waiting_exams(db)) == [1, 2]
+
+def test_skip_locked_promotes_free_exams(db):
+    cancel(db, 1, [1])
+    assert promote_waitlist(db, list(EXAMS), skip_locked=True) == 1 + 4
+    assert promote_waitlist(db, [], skip_locked=True) == 0
+    assert [reservation_count(db, exam_idx) for exam_idx in EXAMS] == [3, 5, 2, 6]
+
+def wait_status(client, exam_idx, headers, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(f"/v1/reservation/{exam_idx}/waitlist", headers=headers)
+        if response.status_code == 200 and response.json()["Status"] == status or time.monotonic() > deadline:
+            return response
+        time.sleep(0.05)
+
+def test_cancel_promotes_waiting_member(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.waitlist import promotion_worker
+
+    # 취소 후 배정 전까지 대기자가 있는 상태를 확인할 수 있도록 배정을 늦춤
+    monkeypatch.setattr(promotion_worker, "batch_delay", 1.0)
+    client = TestClient(app)
+
+    client.post("/v1/admin/users", json={"Id": "waitlist_admin", "Name": "admin", "Password": "pw"})
+    token = client.post("/v1/admin/login", json={"Id": "waitlist_admin", "Password": "pw"}).json()["access_token"]
+    exam = client.post(
+        "/v1/admin/exam",
+        json={"Title": "waitlist exam", "ExamDatetime": "2030-02-01T10:00:00", "PersonnelCount": 1},
+        headers={"Authorization": f"Bearer {token}"}
+    ).json()
+    exam_idx = exam["ExamIdx"]
+
+    headers = {}
+    for member in ("first", "second", "third"):
+        client.post("/v1/users", json={"Id": f"waitlist_{member}", "Name": member, "Password": "pw"})
+        token = client.post("/v1/login", json={"Id": f"waitlist_{member}", "Password": "pw"}).json()["access_token"]
+        headers[member] = {"Authorization": f"Bearer {token}"}
+
+    assert client.post(f"/v1/reservation/{exam_idx}", json={}, headers=headers["first"]).status_code == 200
+    # 정원 초과
+    response = client.post(f"/v1/reservation/{exam_idx}", json={}, headers=headers["second"])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Over Exam Personnel Count"
+
+    assert client.post(f"/v1/reservation/{exam_idx}/waitlist", json={}, headers=headers["second"]).status_code == 200
+    response = client.get(f"/v1/reservation/{exam_idx}/waitlist", headers=headers["second"])
+    assert response.json()["Status"] == WAITLIST_WAITING
+    assert response.json()["Position"] == 1
+
+    assert client.delete(f"/v1/reservation/{exam_idx}", headers=headers["first"]).status_code == 200
+    # 빈 자리가 생겨도 대기자가 있으면 직접 예약 불가
+    response = client.post(f"/v1/reservation/{exam_idx}", json={}, headers=headers["third"])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Over Exam Personnel Count"
+
+    # notify -> 백그라운드 작업 -> 예약 전환
+    response = wait_status(client, exam_idx, headers["second"], WAITLIST_PROMOTED)
+    assert response.json()["Status"] == WAITLIST_PROMOTED
+    assert response.json()["PromotedDatetime"] is not None
+    my = client.get("/v1/reservation/my", headers=headers["second"]).json()
+    assert [row["ExamIdx"] for row in my] == [exam_idx]
+
+    # 배정된 예약을 취소하면 PROMOTED 상태가 남지 않음
+    assert client.delete(f"/v1/reservation/{exam_idx}", headers=headers["second"]).status_code == 200
+    response = client.get(f"/v1/reservation/{exam_idx}/waitlist", headers=headers["second"])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Not Exists Waitlist"